@@ -1,14 +1,82 @@
+import os
+import sys
+import socket
+import shutil
 import requests 
 import time 
 import hashlib
+import threading
 from tqdm import tqdm
 from pathlib import Path
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import HTTPError as Urllib3Error
+from urllib3.util.retry import Retry
 from ..logger.logger import info,warning,error
 
-@dataclass
+# Default directory for downloads
+DOWNLOADS_DIR = Path("downloads")
+# Slotted dataclasses need Python 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+# Smallest range worth a connection of its own
+MIN_PART_SIZE = 1 << 20
+# Default read/write chunk size
+DEFAULT_CHUNK_SIZE = 1 << 20
+# Bytes accumulated before the progress bar is updated
+PROGRESS_STEP = 4 << 20
+# Above this rate downloads are bound by local I/O, below it by the network
+FAST_LINK_RATE = 200 << 20
+SLOW_LINK_RATE = 20 << 20
+# Chunk size used once the link is found to be fast
+FAST_CHUNK_SIZE = 4 << 20
+# Upper bound for the range fan-out on slow links
+MAX_CONNECTIONS = 16
+
+class _RetryableError(RequestException):
+    """Failure of an established transfer: truncated body or checksum mismatch"""
+
+class _RangeIgnoredError(RequestException):
+    """Server advertised range support but answered a range request in full"""
+
+class _SocketOptionsAdapter(HTTPAdapter):
+    """HTTPAdapter enabling TCP keepalive on top of urllib3's TCP_NODELAY default"""
+    
+    socket_options = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+def _fadvise(fd: int, advice: str):
+    """Give the kernel an access pattern hint for the whole file, where supported"""
+    try:
+        os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+    except (AttributeError, OSError):
+        pass
+
+def link_or_copy(src: Path, dst: Path):
+    """
+    Atomically hard link src to dst, so no file data is copied at all
+    
+    Falls back to shutil.copy2 across filesystems, which copies in-kernel via
+    sendfile/copy_file_range on Linux.
+    """
+    if dst.exists() and os.path.samefile(src, dst):
+        return
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+@dataclass(**_DATACLASS_SLOTS)
 class DownloaderInfo:
     name: str
     version: str
@@ -21,7 +89,13 @@ class DownloaderInfo:
         if not self.filename:
             self.filename = Path(self.url).name
         if not self.save_path:
-            self.save_path = Path("downloads") / self.filename
+            self.save_path = DOWNLOADS_DIR / self.filename
+    
+    @classmethod
+    def from_url(cls, name: str, version: str, url: str, checksum: Optional[str] = None) -> 'DownloaderInfo':
+        """Create download info saved under the downloads directory with the URL's file name"""
+        filename = url.rsplit('/', 1)[-1]
+        return cls(name, version, url, filename, checksum, DOWNLOADS_DIR / filename)
 
 class Downloader:
     
@@ -29,27 +103,102 @@ class Downloader:
                  chunk_size: int = None,
                  timeout: int = 60, 
                  retries: int = 3,
-                 retry_delay: int = 2):
+                 retry_delay: int = 2,
+                 num_connections: int = 8,
+                 concurrency: int = 4,
+                 cas_dir: Path = DOWNLOADS_DIR / ".cas"):
         """
         Initialize downloader
         
         Args:
-            chunk_size: Size of data chunk to read at a time (bytes)
+            chunk_size: Size of data chunk to read at a time (bytes), defaults to 1 MiB
+                        aligned to the filesystem block size
             timeout: Request timeout in seconds
-            retries: Maximum number of retries
+            retries: Maximum number of retries, per request and per interrupted transfer
             retry_delay: Base delay between retries in seconds
+            num_connections: Number of parallel range requests per file
+            concurrency: Number of files downloaded at the same time
+            cas_dir: Content-addressable store of verified files, keyed by SHA256
         """
-        self.chunk_size = chunk_size
+        # Large, block aligned chunks keep write() calls and loop iterations low
+        self.chunk_size = chunk_size or max(DEFAULT_CHUNK_SIZE, os.statvfs(Path('.').absolute()).f_bsize * 256)
         self.timeout = timeout
         self.retries = retries
         self.retry_delay = retry_delay
+        self.num_connections = num_connections
+        # Range fan-out is only tuned when range downloads were enabled by the caller
+        self._auto_connections = num_connections > 1
+        self.concurrency = concurrency
+        self.cas_dir = cas_dir
+        # HEAD/GET results keyed by URL: (size, accepts ranges, final URL)
+        self._file_info_cache: Dict[str, Tuple[Optional[int], bool, str]] = {}
         
         # Create persistent session
         self.session = requests.session()
+        # Size the pool for every concurrent range request so kept-alive
+        # connections are reused instead of discarded and re-handshaken.
+        # Connection failures and transient server errors are retried by urllib3
+        # with exponential backoff, honouring Retry-After
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.retry_delay,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD'])
+        )
+        adapter = _SocketOptionsAdapter(
+            pool_connections=16,
+            pool_maxsize=self.concurrency * max(self.num_connections, MAX_CONNECTIONS),
+            max_retries=retry
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36'
         })
     
+    def _tune(self, nbytes: int, elapsed: float, ranged: bool):
+        """
+        Adapt chunk size and range fan-out to the throughput of the last download
+        
+        Args:
+            nbytes: Bytes transferred
+            elapsed: Transfer time in seconds
+            ranged: Whether the transfer used parallel range requests
+        """
+        if nbytes < MIN_PART_SIZE or elapsed <= 0:
+            return
+        rate = nbytes / elapsed
+        if rate > FAST_LINK_RATE and self.chunk_size < FAST_CHUNK_SIZE:
+            self.chunk_size = FAST_CHUNK_SIZE
+            info(f"Download ran at {rate / (1 << 20):.0f} MiB/s, bound by local I/O: "
+                 f"using {FAST_CHUNK_SIZE >> 20} MiB chunks")
+        elif (rate < SLOW_LINK_RATE and ranged and self._auto_connections
+                and self.num_connections < MAX_CONNECTIONS):
+            self.num_connections = min(self.num_connections * 2, MAX_CONNECTIONS)
+            info(f"Download ran at {rate / (1 << 20):.1f} MiB/s, bound by the network: "
+                 f"using {self.num_connections} range connections")
+    
+    def _store_cas(self, download_info: DownloaderInfo):
+        """Add a verified download to the content-addressable store"""
+        if not download_info.checksum:
+            return
+        try:
+            cas_path = self.cas_dir / download_info.checksum
+            if not cas_path.exists():
+                self.cas_dir.mkdir(parents=True, exist_ok=True)
+                link_or_copy(download_info.save_path, cas_path)
+        except OSError as e:
+            warning(f"Failed to add {download_info.save_path} to download cache: {e}")
+    
+    def _update_hash(self, sha256_hash, file_path: Path):
+        """Feed file content into a running hash"""
+        with open(file_path, "rb") as f:
+            _fadvise(f.fileno(), 'POSIX_FADV_SEQUENTIAL')
+            for byte_block in iter(lambda: f.read(self.chunk_size), b""):
+                sha256_hash.update(byte_block)
+            # Content is hashed once, keep it from crowding the page cache
+            _fadvise(f.fileno(), 'POSIX_FADV_DONTNEED')
+    
     def verify_file(self, file_path: Path, expected_hash: Optional[str] = None) -> bool:
         """
         Verify file integrity
@@ -61,33 +210,175 @@ class Downloader:
         Returns:
             bool: Whether the file is valid
         """
-        if not file_path.exists():
+        if not expected_hash:
+            return file_path.is_file()
+        return self._verify_sha256(file_path, expected_hash)
+    
+    def _verify_sha256(self, file_path: Path, expected_hash: str) -> bool:
+        """Check that a file exists and matches the expected SHA256 hash"""
+        if not file_path.is_file():
             return False
-
-        if expected_hash:
-            sha256_hash = hashlib.sha256()
-            try:
-                with open(file_path, "rb") as f:
-                    for byte_block in iter(lambda: f.read(self.chunk_size), b""):
-                        sha256_hash.update(byte_block)
+        try:
+            if sys.version_info >= (3, 11):
+                # Hash in C with a reusable buffer, no per-chunk Python loop
+                with open(file_path, "rb", buffering=0) as f:
+                    _fadvise(f.fileno(), 'POSIX_FADV_SEQUENTIAL')
+                    actual_hash = hashlib.file_digest(f, "sha256").hexdigest()
+                    _fadvise(f.fileno(), 'POSIX_FADV_DONTNEED')
+            else:
+                sha256_hash = hashlib.sha256()
+                self._update_hash(sha256_hash, file_path)
                 actual_hash = sha256_hash.hexdigest()
-                if actual_hash != expected_hash:
-                    warning(f"File checksum mismatch: {file_path}")
-                    return False
-            except IOError as e:
-                error(f"IO error during file verification: {e}")
+            if actual_hash != expected_hash:
+                warning(f"File checksum mismatch: {file_path}")
                 return False
+        except IOError as e:
+            error(f"IO error during file verification: {e}")
+            return False
         return True
 
-    def _get_file_size(self, url: str) ->Optional[int]:
-        """Get remote file size"""
+    def verify_files(self, items: List[Tuple[Path, Optional[str]]]) -> Dict[Path, bool]:
+        """
+        Verify several files in parallel
+        
+        hashlib releases the GIL while hashing large buffers, so each file is
+        hashed on its own core.
+        
+        Args:
+            items: List of (file_path, expected_hash) pairs
+            
+        Returns:
+            Dict[Path, bool]: Verification results {file_path: is_valid}
+        """
+        if not items:
+            return {}
+        workers = min(len(items), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {path: executor.submit(self.verify_file, path, expected_hash) for path, expected_hash in items}
+            return {path: future.result() for path, future in futures.items()}
+
+    @staticmethod
+    def _parse_file_info(response: requests.Response) -> Tuple[Optional[int], bool, str]:
+        """Extract file size, range support and final URL from a full (non-range) response"""
+        total_size = int(response.headers.get('Content-Length', 0)) or None
+        accept_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+        return total_size, accept_ranges, response.url
+    
+    def _get_file_info(self, url: str) -> Tuple[Optional[int], bool, str]:
+        """Get remote file size, range support and final URL after redirects"""
+        if url in self._file_info_cache:
+            return self._file_info_cache[url]
         try:
-            response = self.session.head(url, timeout=self.timeout)
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
             response.raise_for_status()
-            return int(response.headers.get('Content-Length', 0))
+            self._file_info_cache[url] = self._parse_file_info(response)
+            return self._file_info_cache[url]
         except Exception as e:
-            warning(f"Failed to get file size: {e}")
-            return None
+            warning(f"Failed to get file info: {e}")
+            return None, False, url
+    
+    def _download_ranges(self, download_info: DownloaderInfo, url: str, part_path: Path, total_size: int):
+        """
+        Download file with parallel HTTP range requests
+        
+        Args:
+            download_info: Download information object
+            url: Resolved file URL
+            part_path: Temporary file the ranges are written into
+            total_size: Remote file size in bytes
+        """
+        part = -(-total_size // min(self.num_connections, -(-total_size // MIN_PART_SIZE)))
+        parts = [(start, min(start + part, total_size) - 1) for start in range(0, total_size, part)]
+        lock = threading.Lock()
+        
+        fd = os.open(part_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            # Reserve the extent up front so the range writes are pure data updates
+            try:
+                os.posix_fallocate(fd, 0, total_size)
+            except (AttributeError, OSError):
+                os.ftruncate(fd, total_size)
+            with tqdm(
+                total=total_size,
+                unit='iB',
+                unit_scale=True,
+                unit_divisor=1024,
+                mininterval=0.25,
+                desc=f"Downloading {download_info.name} {download_info.version}"
+            ) as progress_bar:
+                def fetch(start: int, end: int):
+                    with self.session.get(
+                        url,
+                        stream=True,
+                        headers={'Range': f'bytes={start}-{end}'},
+                        timeout=self.timeout
+                    ) as response:
+                        response.raise_for_status()
+                        if response.status_code != 206:
+                            raise _RangeIgnoredError("Server ignored range request")
+                        offset = start
+                        pending = 0
+                        for chunk in response.raw.stream(self.chunk_size, decode_content=True):
+                            if chunk:
+                                os.pwrite(fd, chunk, offset)
+                                offset += len(chunk)
+                                pending += len(chunk)
+                                if pending >= PROGRESS_STEP:
+                                    with lock:
+                                        progress_bar.update(pending)
+                                    pending = 0
+                        with lock:
+                            progress_bar.update(pending)
+                        if offset != end + 1:
+                            raise _RetryableError(f"Incomplete range {start}-{end}")
+                
+                with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+                    futures = [executor.submit(fetch, start, end) for start, end in parts]
+                    for future in futures:
+                        future.result()
+        finally:
+            os.close(fd)
+    
+    def _copy_stream(self, raw, f, sha256_hash, progress_bar):
+        """
+        Copy a response body into an open file
+        
+        Reads alternate between two reused buffers. urllib3 implements readinto
+        on top of read(), so each chunk is still allocated as bytes once before
+        being copied in. While one buffer is filled from the socket the other is
+        hashed on a helper thread; hashlib releases the GIL for large updates,
+        so hashing overlaps the network wait instead of adding to it.
+        
+        Args:
+            raw: urllib3 response to read from
+            f: File to write into
+            sha256_hash: Running hash to update, or None
+            progress_bar: tqdm progress bar
+        """
+        bufs = [memoryview(bytearray(self.chunk_size)) for _ in range(2)]
+        hashed = [None, None]
+        pending = 0
+        with ThreadPoolExecutor(max_workers=1) as hasher:
+            i = 0
+            while True:
+                # Wait until the buffer filled two reads ago has been hashed
+                if hashed[i]:
+                    hashed[i].result()
+                n = raw.readinto(bufs[i])
+                if not n:
+                    break
+                f.write(bufs[i][:n])
+                if sha256_hash:
+                    hashed[i] = hasher.submit(sha256_hash.update, bufs[i][:n])
+                pending += n
+                if pending >= PROGRESS_STEP:
+                    progress_bar.update(pending)
+                    pending = 0
+                i ^= 1
+            for future in hashed:
+                if future:
+                    future.result()
+        progress_bar.update(pending)
     
     def download_file(self, download_info: DownloaderInfo)-> Tuple[bool, str]:
         """
@@ -100,6 +391,7 @@ class Downloader:
             Tuple[bool, str]: (Success status, Message)
         """
         save_path = download_info.save_path
+        part_path = save_path.with_name(save_path.name + '.part')
         url = download_info.url
         
         try:
@@ -108,26 +400,72 @@ class Downloader:
             
             # Check if already downloaded
             file_size = 0
-            if save_path.exists():
-                if self.verify_file(save_path, download_info.checksum):
+            if save_path.is_file():
+                if not download_info.checksum:
+                    info(f"File exists, no checksum to verify: {save_path}")
+                    return True, "File already downloaded"
+                if self._verify_sha256(save_path, download_info.checksum):
                     info(f"File exists and verified: {save_path}")
                     return True, "File already downloaded"
                 file_size = save_path.stat().st_size
             
-            # Get remote file size
-            total_size = self._get_file_size(url)
+            # Reuse an identical file downloaded earlier; cached blobs share an inode
+            # with earlier save paths, so make sure nothing has modified them since
+            cas_path = self.cas_dir / download_info.checksum if download_info.checksum else None
+            if cas_path and cas_path.exists():
+                if self.verify_file(cas_path, download_info.checksum):
+                    link_or_copy(cas_path, save_path)
+                    info(f"File found in download cache: {save_path}")
+                    return True, "CAS hit"
+                cas_path.unlink()
+            
+            # Get remote file size, the HEAD round-trip is only needed to check a
+            # partial file or to plan range requests
+            if file_size > 0 or self.num_connections > 1:
+                total_size, accept_ranges, url = self._get_file_info(url)
+            else:
+                total_size, accept_ranges = None, False
+            # A full-sized local file already failed verification above
             if total_size is not None and file_size >= total_size:
-                if self.verify_file(save_path, download_info.checksum):
-                    return True, "File already downloaded"
                 warning("Local file size abnormal, redownloading")
                 file_size = 0
             
-            # Resume download
-            headers = {'Range' : f'btyes={file_size}-'} if file_size > 0 else {}
+            # Download into part_path and rename into place, never writing save_path in
+            # place: it may share an inode with cached blobs. A partial file linked to
+            # the cache is a complete download of different content, not a resumable one
+            if file_size > 0:
+                if save_path.stat().st_nlink > 1:
+                    save_path.unlink()
+                    file_size = 0
+                else:
+                    os.replace(save_path, part_path)
+            
+            # Fresh downloads from servers supporting ranges are fetched in parallel
+            parallel = bool(accept_ranges and total_size and file_size == 0 and self.num_connections > 1)
             
-            # Retry loop
+            # Retry loop, only for transfers that broke off after the request succeeded
             for attempt in range(self.retries):
+                started = time.perf_counter()
                 try:
+                    if parallel:
+                        try:
+                            self._download_ranges(download_info, url, part_path, total_size)
+                        except _RangeIgnoredError:
+                            # Fall through to a single streaming GET in this attempt
+                            warning("Server ignored range request, downloading in a single stream")
+                            part_path.unlink()
+                            parallel = False
+                        else:
+                            self._tune(total_size, time.perf_counter() - started, ranged=True)
+                            if self.verify_file(part_path, download_info.checksum):
+                                os.replace(part_path, save_path)
+                                self._store_cas(download_info)
+                                info(f"File downloaded successfully: {save_path}")
+                                return True, "Download successful"
+                            raise _RetryableError("File verification failed")
+                    
+                    # Resume download
+                    headers = {'Range' : f'bytes={file_size}-'} if file_size > 0 else {}
                     with self.session.get(
                         url,
                         stream=True,
@@ -135,29 +473,47 @@ class Downloader:
                         timeout=self.timeout
                     ) as response:
                         response.raise_for_status()
+                        if file_size > 0:
+                            content_range = response.headers.get('Content-Range', '')
+                            if response.status_code != 206 or not content_range.startswith(f'bytes {file_size}-'):
+                                warning("Server ignored range request, restarting download")
+                                file_size = 0
+                        if file_size == 0:
+                            self._file_info_cache[download_info.url] = self._parse_file_info(response)
                         total_size = int(response.headers.get('Content-Length', 0)) + file_size
                         
+                        # Hash while writing so the file is not read back for verification
+                        sha256_hash = hashlib.sha256() if download_info.checksum else None
+                        if sha256_hash and file_size > 0:
+                            self._update_hash(sha256_hash, part_path)
+                        
+                        response.raw.decode_content = True
                         with tqdm(
                             total=total_size,
                             initial=file_size,
                             unit='iB',
                             unit_scale=True,
                             unit_divisor=1024,
+                            mininterval=0.25,
                             desc=f"Downloading {download_info.name} {download_info.version}"
                         ) as progress_bar:
                             mode = 'ab' if file_size > 0 else 'wb'
-                            with open(save_path, mode) as f:
-                                for chunk in response.iter_content(chunk_size=self.chunk_size):
-                                    if chunk:
-                                        f.write(chunk)
-                                        progress_bar.update(len(chunk))
+                            with open(part_path, mode, buffering=self.chunk_size) as f:
+                                _fadvise(f.fileno(), 'POSIX_FADV_SEQUENTIAL')
+                                self._copy_stream(response.raw, f, sha256_hash, progress_bar)
+                        self._tune(total_size - file_size, time.perf_counter() - started, ranged=False)
                         
-                        if self.verify_file(save_path, download_info.checksum):
-                            info(f"File downloaded successfully: {save_path}")
-                            return True, "Download successful"
-                        else:
-                            raise RequestException("File verification failed")
-                except RequestException as e:
+                        if sha256_hash and sha256_hash.hexdigest() != download_info.checksum:
+                            warning(f"File checksum mismatch: {save_path}")
+                            part_path.unlink()
+                            raise _RetryableError("File verification failed")
+                        os.replace(part_path, save_path)
+                        self._store_cas(download_info)
+                        info(f"File downloaded successfully: {save_path}")
+                        return True, "Download successful"
+                except (_RetryableError, Urllib3Error) as e:
+                    # Resume from whatever the failed attempt managed to write
+                    file_size = part_path.stat().st_size if part_path.exists() and not parallel else 0
                     if attempt < self.retries - 1:
                         delay = self.retry_delay * (2 ** attempt)
                         warning(f"Download failed ({e}), retrying in {delay} seconds...")
@@ -169,19 +525,20 @@ class Downloader:
             error(error_msg)
             
             # Clean up incomplete file
-            if save_path.exists():
-                try:
-                    save_path.unlink()
-                    info("Cleaned up incomplete file")
-                except PermissionError:
-                    warning("Unable to clean up incomplete file, may be in use by another process")
+            for path in (save_path, part_path):
+                if path.exists():
+                    try:
+                        path.unlink()
+                        info("Cleaned up incomplete file")
+                    except PermissionError:
+                        warning("Unable to clean up incomplete file, may be in use by another process")
             return False, error_msg
         return False, "Unknown error"
         
     
     def download_files(self, download_infos: List[DownloaderInfo]) -> Dict[str, Tuple[bool, str]]:
         """
-        Download multiple files
+        Download multiple files concurrently
         
         Args:
             download_infos: List of download information objects
@@ -190,9 +547,13 @@ class Downloader:
             Dict[str, Tuple[bool, str]]: Download results dictionary {component_name: (success_status, message)}
         """
         result = {}
-        for info in download_infos:
-            info(f"\nProcessing: {info.name} {info.version}")
-            success, message = self.download_file(info)
-            result[info.name] = (success, message)
-            info("-"*60)
+        workers = max(1, min(self.concurrency, len(download_infos)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for item in download_infos:
+                info(f"\nProcessing: {item.name} {item.version}")
+                futures[item.name] = executor.submit(self.download_file, item)
+            for name, future in futures.items():
+                result[name] = future.result()
+                info("-"*60)
         return result
\ No newline at end of file
@@ -1,14 +1,34 @@
 import os 
+import re
+import select
 import subprocess
+import shlex
 import shutil
+import stat
 import json
-from typing import Dict, List, Tuple, Optional
+import collections
+import tarfile
+import zipfile
+import threading
+from typing import Dict, List, Tuple, Optional, Union
 from pathlib import Path
 from dataclasses import dataclass, field
-from .download import Downloader, DownloaderInfo
+from concurrent.futures import ThreadPoolExecutor
+from .download import Downloader, DownloaderInfo, link_or_copy
 from .path import download_path
 from ..logger.logger import info, warning, error, verbose
 
+# python-apt reads the package cache in-process; fall back to apt-cache without it
+try:
+    import apt
+except ImportError:
+    apt = None
+
+# apt-cache policy output: "  Candidate: <ver>" and version table rows
+# "     <ver> <priority>" / " *** <ver> <priority>"
+_CAND_RE = re.compile(r'^\s*Candidate:\s*(\S+)', re.M)
+_VER_RE = re.compile(r'^(?: {5}| \*\*\* )(\S+)\s+\d+', re.M)
+
 @dataclass
 class ComponentVersion:
     """Component version information"""
@@ -52,7 +72,9 @@ class OpencvConfig:
         'INSTALL_C_EXAMPLES': 'OFF',
         'INSTALL_PYTHON_EXAMPLES': 'OFF',
         'OPENCV_GENERATE_PKGCONFIG': 'ON',
-        'BUILD_EXAMPLES': 'OFF'
+        'BUILD_EXAMPLES': 'OFF',
+        'CMAKE_C_COMPILER_LAUNCHER': 'ccache',
+        'CMAKE_CXX_COMPILER_LAUNCHER': 'ccache'
     })
     
     @property
@@ -72,20 +94,31 @@ class InstallStatus:
     opencv_configured: bool = False
     opencv_compiled: bool = False
     opencv_installed: bool = False
+    _last_bytes: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
 
     def save(self, path: Path):
-        """Save installation status to file"""
-        with open(path, 'w') as f:
-            json.dump(self.__dict__, f)
+        """Save installation status to file atomically, skipping unchanged writes"""
+        data = json.dumps({k: v for k, v in self.__dict__.items() if not k.startswith('_')}).encode()
+        if data == self._last_bytes:
+            return
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._last_bytes = data
     
     @classmethod
     def load(cls, path: Path) -> 'InstallStatus':
         """Load installation status from file"""
         if not path.exists():
             return cls()
-        with open(path, 'r') as f:
-            data = json.load(f)
-            return cls(**data)
+        with open(path, 'rb') as f:
+            raw = f.read()
+        status = cls(**json.loads(raw))
+        status._last_bytes = raw
+        return status
 
 class ComponentInstaller:
     """Component installer"""
@@ -98,45 +131,134 @@ class ComponentInstaller:
         self.status = InstallStatus.load(self.status_file)
         self.opencv_src_dir = None  # Add this member variable to save opencv_src_dir
         self.build_dir = None  # Add build_dir as a global variable
+        self._apt_cache = None  # Opened on first version lookup
+        self._cuda_arch = None  # Detected on first use
+        # Cores this process may actually run on (cgroup / affinity limited)
+        try:
+            self._ncpu = len(os.sched_getaffinity(0))
+        except AttributeError:
+            self._ncpu = os.cpu_count() or 4
+        self._done = threading.Event()  # Stops the sudo keepalive
     
-    def _run_command(self, cmd: str, cwd: Optional[Path] = None) -> Tuple[bool, str]:
-        """Execute bash command"""
+    def _run_command(self, cmd: Union[str, List[str]], cwd: Optional[Path] = None,
+                     accumulate: bool = True) -> Tuple[bool, str]:
+        """
+        Execute a shell command string, or an argument list directly without a shell
+        
+        Args:
+            cmd: Command to execute
+            cwd: Working directory
+            accumulate: Return the full stdout; if False only the last 200 lines are kept
+        """
         try:
             # Display the command to be executed
-            info(f"Executing command: {cmd}")
+            info(f"Executing command: {cmd if isinstance(cmd, str) else shlex.join(cmd)}")
             if cwd:
                 info(f"Working directory: {cwd}")
                 
             process = subprocess.Popen(
                 cmd,
-                shell=True,
+                shell=isinstance(cmd, str),
                 cwd=cwd,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
+                stderr=subprocess.PIPE
             )
             
-            # Read output in real-time
-            output = []
-            while True:
-                output_line = process.stdout.readline()
-                if output_line == '' and process.poll() is not None:
-                    break
-                if output_line:
-                    verbose(output_line.strip())  # Display command output using verbose level
-                    output.append(output_line)
-            
-            # Get error output
-            error_output = process.stderr.read()
-            if error_output:
-                warning(error_output.strip())  # Display error output using warning level
+            # Drain stdout and stderr together in bulk reads, so a full stderr
+            # pipe cannot stall the command while we wait on stdout
+            output = [] if accumulate else collections.deque(maxlen=200)
+            stdout_fd, stderr_fd = process.stdout.fileno(), process.stderr.fileno()
+            partial = {stdout_fd: bytearray(), stderr_fd: bytearray()}
+            while partial:
+                readable, _, _ = select.select(list(partial), [], [])
+                for fd in readable:
+                    data = os.read(fd, 1 << 16)
+                    buf = partial[fd]
+                    if data:
+                        buf += data
+                        *lines, rest = buf.split(b'\n')
+                        partial[fd] = rest
+                    else:
+                        # EOF, flush an unterminated last line
+                        lines = [buf] if buf else []
+                        del partial[fd]
+                    for line in lines:
+                        text = line.decode(errors='replace')
+                        if fd == stdout_fd:
+                            verbose(text.strip())  # Display command output using verbose level
+                            output.append(text + '\n')
+                        elif text.strip():
+                            warning(text.strip())  # Display error output using warning level
+            process.wait()
             
             return process.returncode == 0, ''.join(output)
         except Exception as e:
             return False, str(e)
     
+    def _apt_install(self, packages: List[str]) -> Tuple[bool, str]:
+        """
+        Install apt packages in a single transaction
+        
+        The package index is refreshed once up front. If the install fails,
+        broken dependencies are fixed and the install is retried once.
+        
+        Args:
+            packages: Package names
+            
+        Returns:
+            Tuple[bool, str]: (Success status, Message)
+        """
+        success, output = self._run_command("sudo apt-get update")
+        if not success:
+            return False, f"Installation failed: {output}"
+        
+        cmd = "sudo DEBIAN_FRONTEND=noninteractive apt-get install -y --no-install-recommends " + " ".join(packages)
+        success, output = self._run_command(cmd)
+        if success:
+            return True, "Installation successful"
+        
+        # If installation fails, try to fix dependencies
+        success, output = self._run_command("sudo apt --fix-broken install -y")
+        if not success:
+            return False, f"Installation failed: {output}"
+        
+        # Re-attempt to install dependencies
+        success, output = self._run_command(cmd)
+        if not success:
+            return False, f"Installation failed after fix: {output}"
+        return True, "Installation successful"
+    
+    def _get_apt_cache_versions(self, check_components: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Get available component versions from the apt cache via python-apt
+        
+        Args:
+            check_components: Component to package name mapping
+            
+        Returns:
+            Dict[str, List[str]]: Component version dictionary {component_name: [version_list]}
+        """
+        if self._apt_cache is None:
+            self._apt_cache = apt.Cache()
+        
+        versions = {}
+        for comp_name, package_name in check_components.items():
+            if package_name not in self._apt_cache:
+                warning(f"Failed to get {comp_name} version information")
+                versions[comp_name] = []
+                continue
+            
+            pkg = self._apt_cache[package_name]
+            comp_versions = []
+            if pkg.candidate:
+                comp_versions.append(f"{pkg.candidate.version} (candidate)")
+            for pkg_version in pkg.versions:
+                version = pkg_version.version.split('-')[0]  # Remove Ubuntu specific suffix
+                if version not in comp_versions:
+                    comp_versions.append(version)
+            versions[comp_name] = sorted(comp_versions, reverse=True)
+        return versions
+    
     def _get_available_version(self, component: str=None) -> Dict[str, List[str]]:
         """
         Get available component versions
@@ -159,12 +281,24 @@ class ComponentInstaller:
             warning(f"Unknown component: {component}")
             return {}
 
-        versions = {}
         check_components = {component: components[component]} if component else components
-        for comp_name, package_name in check_components.items():
+        if apt is not None:
+            try:
+                return self._get_apt_cache_versions(check_components)
+            except Exception as e:
+                warning(f"python-apt lookup failed, falling back to apt-cache: {e}")
+        
+        versions = {}
+        # Query all packages at once, apt-cache needs no root
+        with ThreadPoolExecutor(max_workers=len(check_components)) as executor:
+            futures = {
+                comp_name: executor.submit(self._run_command, f"apt-cache policy {package_name}")
+                for comp_name, package_name in check_components.items()
+            }
+        for comp_name, future in futures.items():
             try:
                 # Get version information using apt-cache policy
-                success, output = self._run_command(f"sudo apt-cache policy {package_name}")
+                success, output = future.result()
                 if not success:
                     warning(f"Failed to get {comp_name} version information")
                     versions[comp_name] = []
@@ -172,31 +306,15 @@ class ComponentInstaller:
                 
                 # Parse version information
                 comp_versions = []
-                in_version_list = False
-                candidate_version = None
+                candidate = _CAND_RE.search(output)
+                if candidate and candidate.group(1) != '(none)':
+                    comp_versions.append(f"{candidate.group(1)} (candidate)")
                 
-                for line in output.split('\n'):
-                    line = line.strip()
-                    
-                    # Get candidate version
-                    if line.startswith('Candidate:'):
-                        candidate_version = line.split(':')[1].strip()
-                        if candidate_version != '(none)':
-                            comp_versions.append(f"{candidate_version} (candidate)")
-                    
-                    # Version list
-                    if line.startswith('Version table:'):
-                        in_version_list = True
-                        continue
-                    
-                    if in_version_list and line:
-                        # Extract version number from the first column
-                        version = line.split()[0]
-                        if version and version != '(none)':
-                            # Clean version number
-                            version = version.split('-')[0]  # Remove Ubuntu specific suffix
-                            if version not in comp_versions:
-                                comp_versions.append(version)
+                # Version table entries, the installed one is marked with ***
+                for version in _VER_RE.findall(output):
+                    version = version.split('-')[0]  # Remove Ubuntu specific suffix
+                    if version not in comp_versions:
+                        comp_versions.append(version)
                 
                 versions[comp_name] = sorted(comp_versions, reverse=True)
             except Exception as e:
@@ -216,23 +334,29 @@ class ComponentInstaller:
             else:
                 info("  No available versions found")
                 
+    def _start_sudo_keepalive(self):
+        """Authenticate sudo once and keep the credential cache fresh in the background"""
+        success, output = self._run_command("sudo -v")
+        if not success:
+            warning(f"Failed to authenticate sudo: {output}")
+            return
+        self._done = threading.Event()
+        
+        def keepalive(done: threading.Event):
+            while not done.wait(50):
+                subprocess.run(["sudo", "-nv"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        
+        threading.Thread(target=keepalive, args=(self._done,), name="sudo-keepalive", daemon=True).start()
+    
     def install_cuda_stack(self) -> Tuple[bool, str]:
         """
         Install CUDA toolchain
         """
         try:
             # Use default
-            commands = [
-                "sudo apt-get update",
-                "sudo apt-get install -y cuda",
-                "sudo apt-get install -y libcudnn8 libcudnn8-dev",
-                "sudo apt-get install -y tensorrt",
-                "sudo apt-get install -y libnvvpi2"
-            ]
-            for cmd in commands:
-                success, output = self._run_command(cmd)
-                if not success:
-                    return False, f"Installation failed: {output}"
+            success, output = self._apt_install(["cuda", "libcudnn8", "libcudnn8-dev", "tensorrt", "libnvvpi2"])
+            if not success:
+                return False, output
 
             # Set environment variables
             env_vars = [
@@ -240,20 +364,22 @@ class ComponentInstaller:
                 'export LD_LIBRARY_PATH=/usr/local/cuda/lib64:$LD_LIBRARY_PATH'
             ]
             
-            # Write to .bashrc
-            with open(os.path.expanduser('~/.bashrc'), 'a') as f:
-                for var in env_vars:
-                    f.write(f'\n{var}')
+            # Write to .bashrc, skipping lines already present from earlier runs
+            bashrc = os.path.expanduser('~/.bashrc')
+            try:
+                with open(bashrc) as f:
+                    existing = f.read().splitlines()
+            except FileNotFoundError:
+                existing = []
+            missing = [var for var in env_vars if var not in existing]
+            if missing:
+                with open(bashrc, 'a') as f:
+                    for var in missing:
+                        f.write(f'\n{var}')
             
-            # Refresh environment variables
-            refresh_cmds = [
-                "source ~/.bashrc",
-                "hash -r"  # Clear command cache
-            ]
-            for cmd in refresh_cmds:
-                success, output = self._run_command(cmd)
-                if not success:
-                    warning(f"Failed to refresh environment: {output}")
+            # Refresh environment variables for this process and its children
+            self._prepend_env('PATH', '/usr/local/cuda/bin')
+            self._prepend_env('LD_LIBRARY_PATH', '/usr/local/cuda/lib64')
             
             # Verify installation
             verification_results = self.verify_all_components()
@@ -267,6 +393,13 @@ class ComponentInstaller:
             error(f"CUDA installation error: {e}")
             return False, str(e)
         
+    @staticmethod
+    def _prepend_env(name: str, path: str) -> None:
+        """Prepend a directory to a path-like environment variable if missing"""
+        entries = [p for p in os.environ.get(name, '').split(os.pathsep) if p]
+        if path not in entries:
+            os.environ[name] = os.pathsep.join([path] + entries)
+        
     def verify_all_components(self) -> Dict[str, Tuple[bool, str]]:
         """Verify all installed components"""
         results = {}
@@ -291,29 +424,34 @@ class ComponentInstaller:
         Returns:
             str: CUDA architecture version (e.g., '7.2')
         """
+        # The board never changes, detect once
+        if self._cuda_arch is None:
+            self._cuda_arch = self._detect_cuda_arch()
+        return self._cuda_arch
+    
+    def _detect_cuda_arch(self) -> str:
+        """Detect CUDA architecture version from the device tree model"""
         try:
-            success, output = self._run_command("cat /proc/device-tree/model")
-            if success:
-                if "jetson-orin-nano" in output.lower():
-                    info("Detected Jetson Orin Nano device, using architecture 8.6")
-                    return "8.6"
-                elif "jetson-orin-nx" in output.lower():
-                    info("Detected Jetson Orin NX device, using architecture 8.7")
-                    return "8.7"
-                elif "jetson-agx" in output.lower():
-                    info("Detected Jetson AGX device, using architecture 7.2")
-                    return "7.2"
-                elif "jetson-xaiver-nx" in output.lower():
-                    info("Detected Jetson Xavier NX device, using architecture 6.2")
-                    return "6.2"
-                else:
-                    warning("No Jetson device detected, using default architecture 7.2")
-                    return "7.2"
-            else:
-                warning("Unable to get device information, using default architecture 7.2")
-                return "7.2"
-        except Exception as e:
-            error(f"Failed to get CUDA architecture: {e}")
+            with open("/proc/device-tree/model", errors="ignore") as f:
+                model = f.read().lower()
+        except OSError as e:
+            warning(f"Unable to get device information ({e}), using default architecture 7.2")
+            return "7.2"
+        
+        if "jetson-orin-nano" in model:
+            info("Detected Jetson Orin Nano device, using architecture 8.6")
+            return "8.6"
+        elif "jetson-orin-nx" in model:
+            info("Detected Jetson Orin NX device, using architecture 8.7")
+            return "8.7"
+        elif "jetson-agx" in model:
+            info("Detected Jetson AGX device, using architecture 7.2")
+            return "7.2"
+        elif "jetson-xaiver-nx" in model:
+            info("Detected Jetson Xavier NX device, using architecture 6.2")
+            return "6.2"
+        else:
+            warning("No Jetson device detected, using default architecture 7.2")
             return "7.2"
                     
     def _save_status(self):
@@ -333,6 +471,52 @@ class ComponentInstaller:
             
         return True, "Build directory ready"
 
+    def _build_generator(self) -> Tuple[str, str, str]:
+        """
+        CMake generator to build with: Ninja when installed, else Makefiles
+        
+        Returns:
+            Tuple[str, str, str]: (generator name, absolute build tool path, build file it writes)
+        """
+        # Absolute paths, sudo only searches its secure_path (e.g. not a pip ~/.local/bin)
+        ninja = shutil.which('ninja')
+        if ninja:
+            return "Ninja", ninja, "build.ninja"
+        return "Unix Makefiles", shutil.which('make') or "/usr/bin/make", "Makefile"
+    
+    def _extract_archive(self, archive: Path, dest: Path) -> Tuple[bool, str]:
+        """Extract a .zip or .tar.gz archive in-process"""
+        info(f"Extracting {archive.name}")
+        try:
+            if archive.suffix == '.zip':
+                with zipfile.ZipFile(archive) as z:
+                    for member in z.infolist():
+                        mode = member.external_attr >> 16
+                        if stat.S_ISLNK(mode):
+                            # zipfile would write the link as a file holding its target
+                            link = dest / member.filename
+                            if member.filename.startswith('/') or '..' in Path(member.filename).parts:
+                                warning(f"Skipping unsafe symlink entry: {member.filename}")
+                                continue
+                            link.parent.mkdir(parents=True, exist_ok=True)
+                            if os.path.lexists(link):
+                                os.unlink(link)
+                            os.symlink(z.read(member).decode(), link)
+                            continue
+                        path = z.extract(member, dest)
+                        if mode:
+                            # zipfile does not restore permissions, keep scripts executable
+                            os.chmod(path, mode & 0o7777)
+            else:
+                # Single streaming pass over the compressed file
+                with tarfile.open(archive, 'r|gz') as t:
+                    if hasattr(tarfile, 'data_filter'):
+                        t.extraction_filter = tarfile.data_filter
+                    t.extractall(dest)
+            return True, "Extraction successful"
+        except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+            return False, str(e)
+    
     def _configure_opencv(self, opencv_config: OpencvConfig, opencv_dir: Path, version: ComponentVersion) -> Tuple[bool, str]:
         """Configure OpenCV"""
         success, message = self._ensure_build_dir()
@@ -346,12 +530,22 @@ class ComponentInstaller:
             'PYTHON_EXECUTABLE': '/usr/lib/python3/dist-packages',
             'CUDA_ARCH_BIN': cuda_arch
         })
+        if not shutil.which('ccache'):
+            warning("ccache not found, compiling without object cache")
+            for launcher in ('CMAKE_C_COMPILER_LAUNCHER', 'CMAKE_CXX_COMPILER_LAUNCHER'):
+                cmake_option.pop(launcher, None)
+        
+        generator, _, _ = self._build_generator()
+        if generator != "Ninja":
+            warning("ninja not found, building with make")
         
-        cmake_cmd = "cmake " + " ".join(f"-D{k}={v}" for k,v in cmake_option.items())
-        cmake_cmd += " .."
-        info(f"Executing cmake command: {cmake_cmd}")
-        info(f"Working directory: {self.build_dir}")
+        # A cache left by a configuration with another generator cannot be reused
+        cmake_cache = self.build_dir / 'CMakeCache.txt'
+        if cmake_cache.exists() and f'CMAKE_GENERATOR:INTERNAL={generator}' not in cmake_cache.read_text(errors='ignore'):
+            cmake_cache.unlink()
+            shutil.rmtree(self.build_dir / 'CMakeFiles', ignore_errors=True)
         
+        cmake_cmd = ["cmake", "-G", generator, *(f"-D{k}={v}" for k,v in cmake_option.items()), ".."]
         success, output = self._run_command(cmake_cmd, self.build_dir)
         if not success:
             return False, f"OpenCV configuration failed: {output}"
@@ -364,9 +558,10 @@ class ComponentInstaller:
         if not success:
             return False, message
             
-        cpu_count = os.cpu_count() or 4
+        cpu_count = self._ncpu
+        _, build_tool, _ = self._build_generator()
         info(f"Starting compilation in directory: {self.build_dir}")
-        success, output = self._run_command(f"cd {self.build_dir} && make -j{cpu_count}")
+        success, output = self._run_command([build_tool, f"-j{cpu_count}", f"-l{cpu_count}"], self.build_dir, accumulate=False)
         if not success:
             return False, f"OpenCV compilation failed: {output}"
             
@@ -378,8 +573,11 @@ class ComponentInstaller:
         if not success:
             return False, message
             
+        _, build_tool, _ = self._build_generator()
         info(f"Starting installation in directory: {self.build_dir}")
-        success, output = self._run_command(f"cd {self.build_dir} && sudo make install")
+        # sudo drops CCACHE_DIR; anything rebuilt as root must not land in a root-owned cache
+        success, output = self._run_command(["sudo", "env", "CCACHE_DISABLE=1", build_tool, "install"],
+                                            self.build_dir, accumulate=False)
         if not success:
             return False, f"OpenCV installation failed: {output}"
             
@@ -400,39 +598,21 @@ class ComponentInstaller:
                 info("OpenCV installation already complete, skipping installation steps")
                 return True, "OpenCV already installed"
             
+            # The remaining steps run sudo many times, ask for the password only once
+            self._start_sudo_keepalive()
+            
             # Check if download is needed
             if not self.status.opencv_downloaded:
                 # Check if OpenCV 4.4.0 installation package exists locally
-                if version == ComponentVersion(4, 4, 0):
-                    local_opencv = self.work_dir / "opencv-4.4.0.tar.gz"
-                    local_opencv_contrib = self.work_dir / "opencv_contrib-4.4.0.tar.gz"
-                    if local_opencv.exists() and local_opencv_contrib.exists():
-                        info("Using local OpenCV 4.4.0 installation package")
-                        shutil.copy(local_opencv, opencv_dir / "opencv.tar.gz")
-                        shutil.copy(local_opencv_contrib, opencv_dir / "opencv_contrib.tar.gz")
-                    else:
-                        # Download OpenCV
-                        downloads = [
-                            DownloaderInfo(
-                                name="OpenCV",
-                                version=str(version),
-                                url=opencv_config.main_url,
-                                filename=f"opencv-{version}.zip",
-                                save_path=opencv_dir / f"opencv-{version}.zip"
-                            ),
-                            DownloaderInfo(
-                                name="OpenCV-Contrib",
-                                version=str(version),
-                                url=opencv_config.contrib_url,
-                                filename=f"opencv_contrib-{version}.zip",
-                                save_path=opencv_dir / f"opencv_contrib-{version}.zip"
-                            )]
-                        for download_info in downloads:
-                            success, message = self.downloader.download_file(download_info)
-                            if not success:
-                                return False, f"OpenCV download failed: {message}"
+                local_opencv = self.work_dir / "opencv-4.4.0.tar.gz"
+                local_opencv_contrib = self.work_dir / "opencv_contrib-4.4.0.tar.gz"
+                if (version == ComponentVersion(4, 4, 0)
+                        and local_opencv.exists() and local_opencv_contrib.exists()):
+                    info("Using local OpenCV 4.4.0 installation package")
+                    link_or_copy(local_opencv, opencv_dir / "opencv.tar.gz")
+                    link_or_copy(local_opencv_contrib, opencv_dir / "opencv_contrib.tar.gz")
                 else:
-                    # Download specified version of OpenCV
+                    # Download OpenCV and OpenCV-Contrib concurrently
                     downloads = [
                         DownloaderInfo(
                             name="OpenCV",
@@ -448,8 +628,8 @@ class ComponentInstaller:
                             filename=f"opencv_contrib-{version}.zip",
                             save_path=opencv_dir / f"opencv_contrib-{version}.zip"
                         )]
-                    for download_info in downloads:
-                        success, message = self.downloader.download_file(download_info)
+                    results = self.downloader.download_files(downloads)
+                    for success, message in results.values():
                         if not success:
                             return False, f"OpenCV download failed: {message}"
                 
@@ -458,46 +638,35 @@ class ComponentInstaller:
             
             # Check if dependencies need to be installed
             if not self.status.dependencies_installed:
-                # Install OpenCV dependencies
-                deps_cmds = [
-                    "sudo apt-get install qt5-default qtcreator -y",
-                    "sudo apt-get install -y build-essential git unzip pkg-config zlib1g-dev",
-                    "sudo apt-get install -y python3-dev python3-numpy",
-                    "sudo apt-get install -y gstreamer1.0-tools libgstreamer-plugins-base1.0-dev",
-                    "sudo apt-get install -y libgstreamer-plugins-good1.0-dev",
-                    "sudo apt-get install -y libtbb2 libgtk-3-dev libxine2-dev",
-                    "sudo apt-get install -y cmake",
-                    "sudo apt-get install -y libjpeg-dev libjpeg8-dev libjpeg-turbo8-dev",
-                    "sudo apt-get install -y libpng-dev libtiff-dev libglew-dev",
-                    "sudo apt-get install -y libavcodec-dev libavformat-dev libswscale-dev",
-                    "sudo apt-get install -y libgtk2.0-dev libgtk-3-dev libcanberra-gtk*",
-                    "sudo apt-get install -y python3-pip",
-                    "sudo apt-get install -y libxvidcore-dev libx264-dev",
-                    "sudo apt-get install -y libtbb-dev libdc1394-22-dev libxine2-dev",
-                    "sudo apt-get install -y libv4l-dev v4l-utils qv4l2",
-                    "sudo apt-get install -y libtesseract-dev libpostproc-dev",
-                    "sudo apt-get install -y libavresample-dev libvorbis-dev",
-                    "sudo apt-get install -y libfaac-dev libmp3lame-dev libtheora-dev",
-                    "sudo apt-get install -y libopencore-amrnb-dev libopencore-amrwb-dev",
-                    "sudo apt-get install -y libopenblas-dev libatlas-base-dev libblas-dev",
-                    "sudo apt-get install -y liblapack-dev liblapacke-dev libeigen3-dev gfortran",
-                    "sudo apt-get install -y libhdf5-dev libprotobuf-dev protobuf-compiler",
-                    "sudo apt-get install -y libgoogle-glog-dev libgflags-dev"
+                # Install OpenCV dependencies in a single apt transaction
+                deps_pkgs = [
+                    "qt5-default", "qtcreator",
+                    "build-essential", "git", "unzip", "pkg-config", "zlib1g-dev",
+                    "python3-dev", "python3-numpy",
+                    "gstreamer1.0-tools", "libgstreamer-plugins-base1.0-dev",
+                    "libgstreamer-plugins-good1.0-dev",
+                    "libtbb2", "libgtk-3-dev", "libxine2-dev",
+                    "cmake", "ninja-build", "ccache",
+                    "libjpeg-dev", "libjpeg8-dev", "libjpeg-turbo8-dev",
+                    "libpng-dev", "libtiff-dev", "libglew-dev",
+                    "libavcodec-dev", "libavformat-dev", "libswscale-dev",
+                    "libgtk2.0-dev", "libcanberra-gtk*",
+                    "python3-pip",
+                    "libxvidcore-dev", "libx264-dev",
+                    "libtbb-dev", "libdc1394-22-dev",
+                    "libv4l-dev", "v4l-utils", "qv4l2",
+                    "libtesseract-dev", "libpostproc-dev",
+                    "libavresample-dev", "libvorbis-dev",
+                    "libfaac-dev", "libmp3lame-dev", "libtheora-dev",
+                    "libopencore-amrnb-dev", "libopencore-amrwb-dev",
+                    "libopenblas-dev", "libatlas-base-dev", "libblas-dev",
+                    "liblapack-dev", "liblapacke-dev", "libeigen3-dev", "gfortran",
+                    "libhdf5-dev", "libprotobuf-dev", "protobuf-compiler",
+                    "libgoogle-glog-dev", "libgflags-dev"
                 ]
-                
-                for cmd in deps_cmds:
-                    success, output = self._run_command(cmd)
-                    if not success:
-                        # If installation fails, try to fix dependencies
-                        fix_cmd = "sudo apt --fix-broken install -y"
-                        success, output = self._run_command(fix_cmd)
-                        if not success:
-                            return False, f"Installation failed: {output}"
-                        
-                        # Re-attempt to install dependencies
-                        success, output = self._run_command(cmd)
-                        if not success:
-                            return False, f"Installation failed after fix: {output}"
+                success, output = self._apt_install(deps_pkgs)
+                if not success:
+                    return False, output
                 
                 self.status.dependencies_installed = True
                 self._save_status()
@@ -507,19 +676,17 @@ class ComponentInstaller:
                 info(f"opencv_dir: {opencv_dir}")
                 self.opencv_src_dir = None
                 
-                # Extract OpenCV source code
-                for archive in opencv_dir.glob("*"):
-                    if archive.is_file() and (archive.suffix == '.zip' or archive.name.endswith('.tar.gz')):
-                        if archive.suffix == '.zip':
-                            cmd = f"unzip -q {archive.name}"
-                        else:
-                            cmd = f"tar -xzf {archive.name}"
-                        success, output = self._run_command(cmd, opencv_dir)
-                        if not success:
-                            return False, f"OpenCV extraction failed: {output}"
-                        
-                        if "contrib" not in archive.name:
-                            self.opencv_src_dir = opencv_dir / f"opencv-{version}"
+                # Extract OpenCV source code; opencv and opencv_contrib unpack into
+                # separate directories, so both are extracted at once
+                archives = list(opencv_dir.glob("*.zip")) + list(opencv_dir.glob("*.tar.gz"))
+                with ThreadPoolExecutor(max_workers=max(1, len(archives))) as executor:
+                    results = list(executor.map(lambda archive: self._extract_archive(archive, opencv_dir), archives))
+                for archive, (success, output) in zip(archives, results):
+                    if not success:
+                        return False, f"OpenCV extraction failed: {output}"
+                    
+                    if "contrib" not in archive.name:
+                        self.opencv_src_dir = opencv_dir / f"opencv-{version}"
                 
                 if not self.opencv_src_dir:
                     return False, "Unable to find OpenCV source code"
@@ -532,6 +699,22 @@ class ComponentInstaller:
                 if not self.opencv_src_dir.exists():
                     return False, "OpenCV source directory not found"
             
+            # Keep compiled objects next to the sources so failed builds can be retried cheaply
+            os.environ.setdefault('CCACHE_DIR', str(self.work_dir / 'ccache'))
+            
+            # A build directory configured by an older run (e.g. with Makefiles) has no
+            # build file for the current generator, configure and build it again
+            if self.status.opencv_configured and not self.status.opencv_installed:
+                success, message = self._ensure_build_dir()
+                if not success:
+                    return False, message
+                _, _, build_file = self._build_generator()
+                if not (self.build_dir / build_file).exists():
+                    warning(f"{build_file} not found in {self.build_dir}, reconfiguring OpenCV")
+                    self.status.opencv_configured = False
+                    self.status.opencv_compiled = False
+                    self._save_status()
+            
             # Check if configuration is needed
             if not self.status.opencv_configured:
                 success, message = self._configure_opencv(opencv_config, opencv_dir, version)
@@ -562,5 +745,7 @@ class ComponentInstaller:
         except Exception as e:
             error(f"OpenCV installation error: {e}")
             return False, str(e)
+        finally:
+            self._done.set()
             
             
\ No newline at end of file
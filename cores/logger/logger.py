@@ -1,9 +1,34 @@
 import threading
-import inspect
+import atexit
+import queue
+import sys
 import os
+import time
 from datetime import datetime
 from .path import logger_path
 
+LOGGER_FILE = os.path.basename(__file__)
+_basenames = {}
+_last_ts = (-1, "")
+# 队列上限, 写线程跟不上时让调用方等待, 避免内存无限增长
+QUEUE_SIZE = 10000
+
+def _basename(filename):
+    # 缓存文件名
+    name = _basenames.get(filename)
+    if name is None:
+        name = _basenames[filename] = os.path.basename(filename)
+    return name
+
+def _ts():
+    # 同一秒内复用已格式化的时间戳, (秒, 字符串)整体替换, 多线程读取时不会错配
+    global _last_ts
+    sec = int(time.time())
+    cached = _last_ts
+    if sec != cached[0]:
+        cached = _last_ts = (sec, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec)))
+    return cached[1]
+
 class Logger:
     COLORS = {
         'FATAL': '\033[91m',  
@@ -16,9 +41,6 @@ class Logger:
     
     def __init__(self, log_to_file=False, log_level='VERBOSE'):
         self.log_to_file = log_to_file
-        self.log_level = log_level
-        self.current_log_file = self._get_log_file_name()
-        self.last_log_time = datetime.now().hour
         self.log_levels = {
             'FATAL': 0,
             'ERROR': 1,
@@ -26,9 +48,30 @@ class Logger:
             'INFO': 3,
             'VERBOSE': 4
         }
+        self.log_level = log_level
+        self.current_log_file = self._get_log_file_name()
+        self.last_log_time = datetime.now().hour
         if self.log_to_file:
             self.file = open(self.current_log_file, 'a', encoding='utf-8')
+        # 后台线程负责输出, 调用方只需入队
+        self._q = queue.Queue(maxsize=QUEUE_SIZE)
+        self._failing = set()
+        self._writer = threading.Thread(target=self._write_loop, name="logger-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
         
+    # level
+    @property
+    def log_level(self):
+        return self._log_level
+    
+    @log_level.setter
+    def log_level(self, level):
+        # 预先计算各级别是否输出, 被过滤的日志只需一次查表
+        self._log_level = level
+        self._threshold = self.log_levels[level]
+        self._enabled = {name: value <= self._threshold for name, value in self.log_levels.items()}
+    
     # name
     def _get_log_file_name(self):
         logger_path.mkdir(exist_ok=True)
@@ -44,45 +87,69 @@ class Logger:
             self.current_log_file = self._get_log_file_name()
             self.file = open(self.current_log_file, 'a', encoding='utf-8')
     
+    # writer
+    def _write_file(self, message):
+        self._check_log_file()
+        self.file.write(message)
+    
+    def _emit(self, channel, func, *args):
+        # 单条日志写入失败不能终止写线程, 每个输出连续失败时只报告一次
+        try:
+            func(*args)
+            self._failing.discard(channel)
+        except Exception as e:
+            if channel not in self._failing:
+                self._failing.add(channel)
+                try:
+                    sys.stderr.write(f"Logger {channel} write failed: {e!r}\n")
+                except Exception:
+                    pass
+    
+    def _write_loop(self):
+        q = self._q
+        while True:
+            record = q.get()
+            if record is None:
+                break
+            console_message, file_message = record
+            self._emit('console', sys.stdout.write, console_message)
+            if self.log_to_file:
+                self._emit('file', self._write_file, file_message)
+            # 队列清空后再统一flush
+            if q.empty():
+                self._emit('console', sys.stdout.flush)
+                if self.log_to_file:
+                    self._emit('file', self.file.flush)
+        self._emit('console', sys.stdout.flush)
+    
     # close file
     def close(self):
+        # 等待队列中的日志写完
+        if self._writer.is_alive():
+            self._q.put(None)
+            self._writer.join()
         if self.log_to_file and hasattr(self, 'file'):
             self.file.close()
     
     def _get_caller_info(self):
-        frame = inspect.currentframe()
-        try:
-            # 跳过logger.py的调用栈
-            while frame:
-                frame = frame.f_back
-                if frame and os.path.basename(frame.f_code.co_filename) != 'logger.py':
-                    break
-            
-            if frame:
-                info = inspect.getframeinfo(frame)
-                filename = os.path.basename(info.filename)
-                return f"{filename}:{info.lineno}"
-            return "unknown:0"
-        finally:
-            del frame
+        # 跳过logger.py的调用栈, 只读取帧属性, 不读取源文件
+        frame = sys._getframe(2)
+        while frame and _basename(frame.f_code.co_filename) == LOGGER_FILE:
+            frame = frame.f_back
+        if frame:
+            return f"{_basename(frame.f_code.co_filename)}:{frame.f_lineno}"
+        return "unknown:0"
     
     # log
     def log(self, level, message):
-        if self.log_levels[level] > self.log_levels[self.log_level]:
+        if not self._enabled[level]:
             return
             
-        if self.log_to_file:
-            self._check_log_file()
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _ts()
         caller_info = self._get_caller_info()
         
-        formatted_message = f"{self.COLORS[level]}[{timestamp}][{level}][{caller_info}] {message}{self.COLORS['RESET']}"
-        print(formatted_message)
-        
-        if self.log_to_file:
-            self.file.write(f"[{timestamp}][{level}][{caller_info}] {message}\n")
-            self.file.flush()
+        record = f"[{timestamp}][{level}][{caller_info}] {message}"
+        self._q.put((f"{self.COLORS[level]}{record}{self.COLORS['RESET']}\n", f"{record}\n"))
 
 # 全局变量
 logger = Logger(log_to_file=False, log_level='VERBOSE')
@@ -100,4 +167,5 @@ def info(message):
     logger.log('INFO', message)
 
 def verbose(message):
-    logger.log('VERBOSE', message)
+    if logger._enabled['VERBOSE']:
+        logger.log('VERBOSE', message)